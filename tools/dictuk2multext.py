@@ -1,440 +1,523 @@
 import sys
 import argparse
+import multiprocessing as mp
 import re
-from typing import List, Set
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-def is_roman(s: str) -> bool:
-    """Check if string is a Roman numeral."""
-    # Normalize to uppercase
-    s = s.upper()
+# Map Cyrillic letters to Latin equivalents (visually similar ones)
+_ROMAN_TRANS = str.maketrans("ІХСМ", "IXCM")
 
-    # Map Cyrillic letters to Latin equivalents (visually similar ones)
-    translation_table = str.maketrans("ІХСМ", "IXCM")
-    s_translated = s.translate(translation_table)
+# Roman numeral pattern - matches valid Roman numerals
+_ROMAN_RE = re.compile(r'^M{0,4}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$')
 
-    # Roman numeral pattern - matches valid Roman numerals
-    roman_pattern = r'^M{0,4}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$'
+def is_roman(s: str) -> bool:
+    """Check if string is a Roman numeral."""
+    return _ROMAN_RE.match(s.upper().translate(_ROMAN_TRANS)) is not None
 
-    return re.match(roman_pattern, s_translated) is not None
+# Words float() accepts besides digits
+_FLOAT_WORDS = frozenset(('inf', 'infinity', 'nan'))
 
 def is_number(s: str) -> bool:
     """Check if string represents a number."""
+    # Settle plain integers/decimals and ordinary words without raising
+    t = s[1:] if s[:1] in ('+', '-') else s
+    if t.replace('.', '', 1).isdecimal():
+        return True
+    if t.isalpha() and t.lower() not in _FLOAT_WORDS:
+        return False
     try:
         float(s)
         return True
     except ValueError:
         return False
 
+# Bit of every tag the converter looks at. Tags of one category take
+# consecutive bits in priority order, so a category is resolved with a
+# single shift-and-mask table lookup where the lowest set bit wins.
+_TAG_BITS = (
+    'nv', 'v_naz', 'v_rod', 'v_dav', 'v_zna', 'v_oru', 'v_mis', 'v_kly',  # (non-declining) case
+    'pres', 'futr', 'past',  # tense
+    '1', '2', '3',  # person
+    'm', 'f', 'n', 'c',  # gender
+    'pers', 'refl', 'pos', 'dem', 'int', 'rel', 'neg', 'ind', 'gen', 'emph',  # pronoun type
+    'noun', 'adj', 'adv',  # syntactic type
+    'p', 's',  # number
+    'ns',
+    'prop', 'geo', 'fname', 'lname', 'pname',
+    'anim', 'unanim', 'inanim',  # animacy
+    'ranim', 'rinanim',  # adjective animacy
+    'imperf', 'perf',  # aspect
+    'impers', 'inf', 'impr', 'advp',  # verb form
+    'actv', 'pasv',  # voice
+    'compc', 'comps',  # degree
+    'long', 'short',  # definiteness
+    'adjp', 'ord', 'coord', 'pron', 'numr',
+)
+_TAG_BIT = {tag: 1 << i for i, tag in enumerate(_TAG_BITS)}
+
+_B_V_ZNA = _TAG_BIT['v_zna']
+_B_PRES = _TAG_BIT['pres']
+_B_PAST = _TAG_BIT['past']
+_B_POS = _TAG_BIT['pos']
+_B_ADJ = _TAG_BIT['adj']
+_B_P = _TAG_BIT['p']
+_B_S = _TAG_BIT['s']
+_B_NS = _TAG_BIT['ns']
+_B_PROPER = (_TAG_BIT['prop'] | _TAG_BIT['geo'] | _TAG_BIT['fname']
+             | _TAG_BIT['lname'] | _TAG_BIT['pname'])
+_B_ANIM = _TAG_BIT['anim']
+_B_INANIM = _TAG_BIT['inanim']
+_B_ADJP = _TAG_BIT['adjp']
+_B_ORD = _TAG_BIT['ord']
+_B_COORD = _TAG_BIT['coord']
+_B_PRON = _TAG_BIT['pron']
+_B_NUMR = _TAG_BIT['numr']
+
+def _tag_lut(first_tag: str, codes: str) -> Tuple[int, int, List[int]]:
+    """Build the (shift, mask, table) lookup for a category of tags.
+
+    The category is len(codes) consecutive tags starting at first_tag; each
+    table entry holds the MSD code of the lowest tag bit set in its index.
+    """
+    shift = _TAG_BITS.index(first_tag)
+    table = [0] * (1 << len(codes))
+    for i in range(1, len(table)):
+        table[i] = ord(codes[(i & -i).bit_length() - 1])
+    return shift, len(table) - 1, table
+
+_CASE_LUT = _tag_lut('nv', '-ngdailv')  # non-declining has no case
+_TENSE_LUT = _tag_lut('pres', 'pfs')
+_PERSON_LUT = _tag_lut('1', '123')
+_GENDER_LUT = _tag_lut('m', 'mfn')
+_GENDER_COMMON_LUT = _tag_lut('m', 'mfnc')
+_PRONOUN_TYPE_LUT = _tag_lut('pers', 'pxsdqrzigh')
+_SYNTACTIC_LUT = _tag_lut('noun', 'nar')
+_NUMBER_LUT = _tag_lut('p', 'ps')
+_ANIMACY_LUT = _tag_lut('anim', 'yyn')  # unanim counts as animate
+_ADJ_ANIMACY_LUT = _tag_lut('ranim', 'yn')
+_ASPECT_LUT = _tag_lut('imperf', 'pe')
+_VFORM_LUT = _tag_lut('impers', 'onmg')
+_VOICE_LUT = _tag_lut('actv', 'ap')
+_DEGREE_LUT = _tag_lut('compc', 'cs')
+_DEFINITENESS_LUT = _tag_lut('long', 'fs')
+
+def _first_code(bits: int, lut: Tuple[int, int, List[int]]) -> int:
+    """Return the MSD code of the first category tag set in bits, or 0."""
+    shift, mask, table = lut
+    return table[bits >> shift & mask]
+
+# Tags of the POS whose MSD depends on the lemma (numeral form,
+# conjunction/preposition formation and preposition case government)
+_LEMMA_TAGS = frozenset(('numr', 'conj', 'prep'))
+
+# MSD of every tag tuple seen so far that does not depend on the lemma;
+# covers the bulk of dictionary lines with a single dict lookup
+_TAGS_MSD = {}
+
 def tags_to_msd(tags: List[str], lemma: str) -> str:
-    """Convert Ukrainian morphological tags to MULTEXT-East MSD format."""
-    msd = ['-'] * 15  # Initialize 15-position MSD template
-    
-    # Convert tags to set for O(1) lookup
-    tag_set = set(tags)
+    """Convert Ukrainian morphological tags to MULTEXT-East MSD format.
+
+    tags must be non-empty, with the base POS tag first, as produced by
+    splitting a dict_uk tag string on ':'.
+    """
+    tags = tuple(tags)
+    msd = _TAGS_MSD.get(tags)
+    if msd is not None:
+        return msd
+    if _LEMMA_TAGS.isdisjoint(tags):
+        # MSD is a function of the tags alone
+        msd = _TAGS_MSD[tags] = _tags_to_msd_cached(tags, '')
+        return msd
+    return _tags_to_msd_cached(tags, lemma)
+
+@lru_cache(maxsize=200_000)
+def _tags_to_msd_cached(tags: Tuple[str, ...], lemma: str) -> str:
+    """Compute the MSD for a tag tuple (memoized by tags_to_msd)."""
+    # Convert tags to a bitmask; tags the converter ignores have no bit
+    bits = 0
+    for tag in tags:
+        bits |= _TAG_BIT.get(tag, 0)
     
     # Handle special cases and determine base POS
-    is_pronoun = 'pron' in tag_set
-    is_predic = 'predic' in tag_set
-    is_numr = 'numr' in tag_set
-    is_adj = 'adj' in tag_set
-    is_adjp = 'adjp' in tag_set
-    is_abbr = 'abbr' in tag_set
-    base_pos = tags[0] if tags else ''
+    is_pronoun = bits & _B_PRON
+    is_numr = bits & _B_NUMR
+    is_adj = bits & _B_ADJ
+    #is_abbr = 'abbr' in tags
+    base_pos = tags[0]
 
+    # MSD template with the POS (Position 0) and the handler for the
+    # remaining positions
     # Special case: numeral + adjective = Numeral
     if is_numr and is_adj:
-        msd[0] = 'M'
-    # POS mapping (Position 0)
+        template, handler = _POS_TABLE['numr']
     elif is_pronoun:
-        msd[0] = 'P'  # Pronoun
+        template, handler = _PRONOUN_ENTRY
     #elif is_abbr:
-    #    msd[0] = 'Y'
+    #    template, handler = _msd_template('Y', 1), None
     else:
-        pos_map = {
-            'noun': 'N',
-            'verb': 'V',
-            'adj': 'A',
-            'adv': 'R',
-            'advp': 'V',  # Gerund
-            'adjp': 'A',  # Adjectival participle → Adjective
-            'prep': 'S',
-            'conj': 'C',
-            'part': 'Q',
-            'intj': 'I',
-            'numr': 'M',
-            'noninfl': 'X',
-            'onomat': 'I',
-            'insert': 'X',
-        }
-        msd[0] = pos_map.get(base_pos, 'X')
-
-    # Process by POS category
-    if msd[0] == 'N':  # Noun
-        _process_noun(msd, tag_set)
-    elif msd[0] == 'V':  # Verb
-        _process_verb(msd, tag_set, base_pos)
-    elif msd[0] == 'A':  # Adjective
-        _process_adjective(msd, tag_set, base_pos, is_adjp)
-    elif msd[0] == 'P':  # Pronoun
-        _process_pronoun(msd, tag_set)
-    elif msd[0] == 'R':  # Adverb
-        _process_adverb(msd, tag_set)
-    elif msd[0] == 'C':  # Conjunction
-        _process_conjunction(msd, tag_set, lemma)
-    elif msd[0] == 'M':  # Numeral
-        _process_numeral(msd, tag_set, lemma, is_adj)
-    elif msd[0] == 'S':  # Preposition
-        _process_preposition(msd, tag_set, lemma)
-
-    # Convert to string and remove trailing hyphens
-    msd_str = ''.join(msd).rstrip('-')
-    return msd_str if msd_str else '-'
-
-def _process_noun(msd: List[str], tag_set: Set[str]) -> None:
+        template, handler = _POS_TABLE.get(base_pos, _UNKNOWN_ENTRY)
+
+    msd = bytearray(template)
+    if handler:
+        handler(msd, bits, lemma)
+
+    # Convert to string and remove trailing hyphens (never the POS itself)
+    return msd.rstrip(b'-').decode('ascii')
+
+# MSD attribute codes as byte values, stored into the MSD buffer
+_CODE_DASH = ord('-')
+_CODE_B = ord('b')
+_CODE_C = ord('c')
+_CODE_D = ord('d')
+_CODE_F = ord('f')
+_CODE_I = ord('i')
+_CODE_L = ord('l')
+_CODE_M = ord('m')
+_CODE_N = ord('n')
+_CODE_O = ord('o')
+_CODE_P = ord('p')
+_CODE_R = ord('r')
+_CODE_S = ord('s')
+_CODE_Y = ord('y')
+
+def _process_noun(msd: bytearray, bits: int, lemma: str) -> None:
     """Process noun-specific MSD positions."""
     # Type (Position 1)
-    if any(t in tag_set for t in ['prop', 'geo', 'fname', 'lname', 'pname']):
-        msd[1] = 'p'  # proper
+    if bits & _B_PROPER:
+        msd[1] = _CODE_P  # proper
     else:
-        msd[1] = 'c'  # common
+        msd[1] = _CODE_C  # common
     
     # Gender (Position 2)
-    if 'p' in tag_set and not any(g in tag_set for g in ['m', 'f', 'n']):
-        msd[2] = '-'  # No gender for pluralia tantum
+    if bits & _B_P and not _first_code(bits, _GENDER_LUT):
+        msd[2] = _CODE_DASH  # No gender for pluralia tantum
     else:
-        if 'm' in tag_set: 
-            msd[2] = 'm'
-        elif 'f' in tag_set: 
-            msd[2] = 'f'
-        elif 'n' in tag_set: 
-            msd[2] = 'n'
-        elif 'c' in tag_set: 
-            msd[2] = 'c'  # common gender
+        gender = _first_code(bits, _GENDER_COMMON_LUT)  # 'c' is common gender
+        if gender:
+            msd[2] = gender
     
     # Number (Position 3)
-    if 'p' in tag_set or 'ns' in tag_set: 
-        msd[3] = 'p'  # plural
+    if bits & (_B_P | _B_NS): 
+        msd[3] = _CODE_P  # plural
     else:
-        msd[3] = 's'  # singular
+        msd[3] = _CODE_S  # singular
     
     # Case (Position 4)
-    if 'nv' in tag_set:
-        msd[4] = '-'  # non-declining
-    else:
-        case_map = {
-            'v_naz': 'n', 'v_rod': 'g', 'v_dav': 'd', 
-            'v_zna': 'a', 'v_oru': 'i', 'v_mis': 'l', 'v_kly': 'v'
-        }
-        for tag, case in case_map.items():
-            if tag in tag_set:
-                msd[4] = case
-                break
+    case = _first_code(bits, _CASE_LUT)
+    if case:
+        msd[4] = case
     
     # Animacy (Position 5)
-    if 'anim' in tag_set or 'unanim' in tag_set: 
-        msd[5] = 'y'  # animate
-    elif 'inanim' in tag_set: 
-        msd[5] = 'n'  # inanimate
+    animacy = _first_code(bits, _ANIMACY_LUT)
+    if animacy:
+        msd[5] = animacy  # animate / inanimate
 
-def _process_verb(msd: List[str], tag_set: Set[str], base_pos: str) -> None:
+def _process_verb(msd: bytearray, bits: int, lemma: str) -> None:
     """Process verb-specific MSD positions."""
     # Type (Position 1)
-    msd[1] = 'm'  # main verb (assuming all are main verbs)
+    msd[1] = _CODE_M  # main verb (assuming all are main verbs)
     
-    # Aspect (Position 2)
-    if 'imperf' in tag_set: 
-        msd[2] = 'p'  # imperfective = progressive
-    elif 'perf' in tag_set: 
-        msd[2] = 'e'  # perfective 
-    else: 
-        msd[2] = 'b'  # biaspectual
-
-    # VForm (Position 3)
-    if 'impers' in tag_set: 
-        msd[3] = 'o'  # impersonal
-    elif 'inf' in tag_set: 
-        msd[3] = 'n'  # infinitive
-    elif 'impr' in tag_set: 
-        msd[3] = 'm'  # imperative
-    elif 'advp' in tag_set or base_pos == 'advp': 
-        msd[3] = 'g'  # gerund
-    else: 
-        msd[3] = 'i'  # indicative
+    # Aspect (Position 2): imperfective = progressive, perfective,
+    # otherwise biaspectual
+    msd[2] = _first_code(bits, _ASPECT_LUT) or _CODE_B
+
+    # VForm (Position 3): impersonal, infinitive, imperative, gerund,
+    # otherwise indicative
+    msd[3] = _first_code(bits, _VFORM_LUT) or _CODE_I
     
     # Tense (Position 4)
-    tense_map = {'pres': 'p', 'futr': 'f', 'past': 's'}
-    for tag, tense in tense_map.items():
-        if tag in tag_set:
-            msd[4] = tense
-            break
+    tense = _first_code(bits, _TENSE_LUT)
+    if tense:
+        msd[4] = tense
     
     # Person (Position 5)
-    person_map = {'1': '1', '2': '2', '3': '3'}
-    for tag, person in person_map.items():
-        if tag in tag_set:
-            msd[5] = person
-            break
+    person = _first_code(bits, _PERSON_LUT)
+    if person:
+        msd[5] = person
     
     # Number (Position 6)
-    if 'p' in tag_set: 
-        msd[6] = 'p'  # plural
-    elif 's' in tag_set: 
-        msd[6] = 's'  # singular
+    number = _first_code(bits, _NUMBER_LUT)
+    if number:
+        msd[6] = number  # plural / singular
 
     # Gender (Position 7) - for past tense
-    gender_map = {'m': 'm', 'f': 'f', 'n': 'n'}
-    for tag, gender in gender_map.items():
-        if tag in tag_set:
-            msd[7] = gender
-            break
+    gender = _first_code(bits, _GENDER_LUT)
+    if gender:
+        msd[7] = gender
 
-def _process_adjective(msd: List[str], tag_set: Set[str], base_pos: str, is_adjp: bool) -> None:
+def _process_adjective(msd: bytearray, bits: int, lemma: str) -> None:
     """Process adjective-specific MSD positions."""
+    is_adjp = bits & _B_ADJP
+
     # Type (Position 1)
     if is_adjp:
-        msd[1] = 'p'  # participle
-    elif 'ord' in tag_set: 
-        msd[1] = 'o'  # ordinal
+        msd[1] = _CODE_P  # participle
+    elif bits & _B_ORD: 
+        msd[1] = _CODE_O  # ordinal
     else: 
-        msd[1] = 'f'  # general adjective
+        msd[1] = _CODE_F  # general adjective
     
-    # Degree (Position 2)
-    if 'compc' in tag_set: 
-        msd[2] = 'c'  # comparative
-    elif 'comps' in tag_set: 
-        msd[2] = 's'  # superlative
-    elif msd[1] == 'f':
-        msd[2] = 'p'  # positive
+    # Degree (Position 2): comparative / superlative, positive for
+    # general adjectives
+    degree = _first_code(bits, _DEGREE_LUT)
+    if degree:
+        msd[2] = degree
+    elif msd[1] == _CODE_F:
+        msd[2] = _CODE_P
     
     # Gender (Position 3)
-    gender_map = {'m': 'm', 'f': 'f', 'n': 'n', 'c': 'c'}
-    for tag, gender in gender_map.items():
-        if tag in tag_set:
-            msd[3] = gender
-            break
+    gender = _first_code(bits, _GENDER_COMMON_LUT)
+    if gender:
+        msd[3] = gender
     
     # Number (Position 4)
-    msd[4] = 'p' if 'p' in tag_set else 's'
+    msd[4] = _CODE_P if bits & _B_P else _CODE_S
     
     # Case (Position 5)
-    if 'nv' in tag_set:
-        msd[5] = '-'  # non-declining
-    else:
-        case_map = {
-            'v_naz': 'n', 'v_rod': 'g', 'v_dav': 'd', 
-            'v_zna': 'a', 'v_oru': 'i', 'v_mis': 'l', 'v_kly': 'v'
-        }
-        for tag, case in case_map.items():
-            if tag in tag_set:
-                msd[5] = case
-                break
-    
-    # Definiteness (Position 6)
-    if 'long' in tag_set: 
-        msd[6] = 'f'  # full (long form)
-    elif 'short' in tag_set: 
-        msd[6] = 's'  # short form
+    case = _first_code(bits, _CASE_LUT)
+    if case:
+        msd[5] = case
+    
+    # Definiteness (Position 6): full (long form) / short form
+    definiteness = _first_code(bits, _DEFINITENESS_LUT)
+    if definiteness:
+        msd[6] = definiteness
     
     # Animacy (Position 7) - only for accusative
-    if 'v_zna' in tag_set:
-        if 'ranim' in tag_set: 
-            msd[7] = 'y'  # animate
-        elif 'rinanim' in tag_set: 
-            msd[7] = 'n'  # inanimate
+    if bits & _B_V_ZNA:
+        animacy = _first_code(bits, _ADJ_ANIMACY_LUT)
+        if animacy:
+            msd[7] = animacy
     
     # Aspect (Position 8) - for participles
     if is_adjp:
-        if 'imperf' in tag_set: 
-            msd[8] = 'p'
-        elif 'perf' in tag_set: 
-            msd[8] = 'e'
+        aspect = _first_code(bits, _ASPECT_LUT)
+        if aspect:
+            msd[8] = aspect
     
     # Voice (Position 9) - for participles
     if is_adjp:
-        if 'actv' in tag_set: 
-            msd[9] = 'a'
-        elif 'pasv' in tag_set: 
-            msd[9] = 'p'
+        voice = _first_code(bits, _VOICE_LUT)
+        if voice:
+            msd[9] = voice
     
     # Tense (Position 10) - for participles
     if is_adjp:
-        if 'pres' in tag_set: 
-            msd[10] = 'p'
-        elif 'past' in tag_set: 
-            msd[10] = 's'
+        if bits & _B_PRES: 
+            msd[10] = _CODE_P
+        elif bits & _B_PAST: 
+            msd[10] = _CODE_S
 
-def _process_pronoun(msd: List[str], tag_set: Set[str]) -> None:
+def _process_pronoun(msd: bytearray, bits: int, lemma: str) -> None:
     """Process pronoun-specific MSD positions."""
     # Type (Position 1)
-    pronoun_type_map = {
-        'pers': 'p', 'refl': 'x', 'pos': 's', 'dem': 'd',
-        'int': 'q', 'rel': 'r', 'neg': 'z', 'ind': 'i',
-        'gen': 'g', 'emph': 'h'
-    }
-    for tag, pron_type in pronoun_type_map.items():
-        if tag in tag_set:
-            msd[1] = pron_type
-            break
+    pron_type = _first_code(bits, _PRONOUN_TYPE_LUT)
+    if pron_type:
+        msd[1] = pron_type
 
     # Referent Type (Position 2) - only for possessive pronouns
-    if 'pos' in tag_set: 
-        msd[2] = 's'
+    if bits & _B_POS: 
+        msd[2] = _CODE_S
     
     # Person (Position 3)
-    person_map = {'1': '1', '2': '2', '3': '3'}
-    for tag, person in person_map.items():
-        if tag in tag_set:
-            msd[3] = person
-            break
+    person = _first_code(bits, _PERSON_LUT)
+    if person:
+        msd[3] = person
     
     # Gender (Position 4)
-    gender_map = {'m': 'm', 'f': 'f', 'n': 'n'}
-    for tag, gender in gender_map.items():
-        if tag in tag_set:
-            msd[4] = gender
-            break
-    else:
-        msd[4] = 'c'  # common gender as default
+    msd[4] = _first_code(bits, _GENDER_LUT) or _CODE_C  # common gender as default
     
     # Animacy (Position 5)
-    if 'anim' in tag_set or 'unanim' in tag_set: 
-        msd[5] = 'y'
-    elif 'inanim' in tag_set: 
-        msd[5] = 'n'
+    animacy = _first_code(bits, _ANIMACY_LUT)
+    if animacy:
+        msd[5] = animacy
     
     # Number (Position 6)
-    msd[6] = 'p' if 'p' in tag_set else 's'
+    msd[6] = _CODE_P if bits & _B_P else _CODE_S
 
     # Case (Position 7)
-    if 'nv' in tag_set:
-        msd[7] = '-'
-    else:
-        case_map = {
-            'v_naz': 'n', 'v_rod': 'g', 'v_dav': 'd', 
-            'v_zna': 'a', 'v_oru': 'i', 'v_mis': 'l', 'v_kly': 'v'
-        }
-        for tag, case in case_map.items():
-            if tag in tag_set:
-                msd[7] = case
-                break
+    case = _first_code(bits, _CASE_LUT)
+    if case:
+        msd[7] = case
             
     # Syntactic Type (Position 8)
-    syntactic_map = {'noun': 'n', 'adj': 'a', 'adv': 'r'}
-    for tag, syn_type in syntactic_map.items():
-        if tag in tag_set:
-            msd[8] = syn_type
-            break
+    syn_type = _first_code(bits, _SYNTACTIC_LUT)
+    if syn_type:
+        msd[8] = syn_type
 
-def _process_adverb(msd: List[str], tag_set: Set[str]) -> None:
+def _process_adverb(msd: bytearray, bits: int, lemma: str) -> None:
     """Process adverb-specific MSD positions."""
-    # Degree (Position 1)
-    if 'compc' in tag_set: 
-        msd[1] = 'c'  # comparative
-    elif 'comps' in tag_set: 
-        msd[1] = 's'  # superlative
-    else: 
-        msd[1] = 'p'  # positive
+    # Degree (Position 1): comparative / superlative, otherwise positive
+    msd[1] = _first_code(bits, _DEGREE_LUT) or _CODE_P
 
-def _process_conjunction(msd: List[str], tag_set: Set[str], lemma: str) -> None:
+def _process_conjunction(msd: bytearray, bits: int, lemma: str) -> None:
     """Process conjunction-specific MSD positions."""
     # Type (Position 1)
-    if 'coord' in tag_set: 
-        msd[1] = 'c'  # coordinative
+    if bits & _B_COORD: 
+        msd[1] = _CODE_C  # coordinative
     else: 
-        msd[1] = 's'  # subordinative
+        msd[1] = _CODE_S  # subordinative
 
     # Formation (Position 2)
     if '-' in lemma or ' ' in lemma: 
-        msd[2] = 'c'  # compound
+        msd[2] = _CODE_C  # compound
     else: 
-        msd[2] = 's'  # simple
+        msd[2] = _CODE_S  # simple
 
-def _process_numeral(msd: List[str], tag_set: Set[str], lemma: str, is_adj: bool) -> None:
+def _process_numeral(msd: bytearray, bits: int, lemma: str) -> None:
     """Process numeral-specific MSD positions."""
     # Form (Position 1)
     if is_number(lemma): 
-        msd[1] = 'd'  # digit
+        msd[1] = _CODE_D  # digit
     elif is_roman(lemma):
-        msd[1] = 'r'  # roman
+        msd[1] = _CODE_R  # roman
     else: 
-        msd[1] = 'l'  # letter
+        msd[1] = _CODE_L  # letter
     
     # Type (Position 2)
-    if is_adj: 
-        msd[2] = 'o'  # ordinal
+    if bits & _B_ADJ: 
+        msd[2] = _CODE_O  # ordinal
     else: 
-        msd[2] = 'c'  # cardinal
+        msd[2] = _CODE_C  # cardinal
     
     # Gender (Position 3)
-    gender_map = {'m': 'm', 'f': 'f', 'n': 'n'}
-    for tag, gender in gender_map.items():
-        if tag in tag_set:
-            msd[3] = gender
-            break
-            
+    gender = _first_code(bits, _GENDER_LUT)
+    if gender:
+        msd[3] = gender
     # Number (Position 4)
-    msd[4] = 's' if 's' in tag_set else 'p'
+    msd[4] = _CODE_S if bits & _B_S else _CODE_P
     
     # Case (Position 5)
-    if 'nv' in tag_set:
-        msd[5] = '-'
-    else:
-        case_map = {
-            'v_naz': 'n', 'v_rod': 'g', 'v_dav': 'd', 
-            'v_zna': 'a', 'v_oru': 'i', 'v_mis': 'l', 'v_kly': 'v'
-        }
-        for tag, case in case_map.items():
-            if tag in tag_set:
-                msd[5] = case
-                break
+    case = _first_code(bits, _CASE_LUT)
+    if case:
+        msd[5] = case
     
     # Animacy (Position 6)
-    if 'anim' in tag_set: 
-        msd[6] = 'y'
-    elif 'inanim' in tag_set: 
-        msd[6] = 'n'
+    if bits & _B_ANIM: 
+        msd[6] = _CODE_Y
+    elif bits & _B_INANIM: 
+        msd[6] = _CODE_N
+
+# Preposition case government, a comprehensive mapping based on Ukrainian
+# grammar. Built once with interned keys and values stored as MSD bytes.
+_CASE_GOVERNMENT = {sys.intern(prep): cases.encode('ascii') for prep, cases in {
+    # Dative only
+    'завдяки': 'd', 'всупереч': 'd', 'усупереч': 'd', 'наперекір': 'd', 
+    'услід': 'd', 'назустріч': 'd', 'напротивагу': 'd',
+    
+    # Accusative only
+    'во': 'a', 'ві': 'a', 'про': 'a', 'через': 'a', 'крізь': 'a', 
+    'скрізь': 'a', 'об': 'a', 'поза': 'a', 'між': 'a', 
+    'незважаючи': 'a',
+    
+    # Instrumental only
+    'згідно з': 'i', 'надо': 'i', 'наді': 'i', 'передо': 'i', 
+    'переді': 'i',
+    
+    # Locative only
+    'при': 'l', 'вві': 'l', 'уві': 'l',
+    
+    # Multiple cases
+    'в': 'agl', 'у': 'agl', 'ув': 'agl', 'попри': 'agl',
+    'за': 'ai', 'над': 'ai', 'перед': 'ai', 'понад': 'ai', 
+    'попід': 'ai', 'під': 'ai',
+    'на': 'al', 'о': 'al', 'по': 'al',
+    'з': 'gi', 'із': 'gi',
+    'меж': 'agi', 'межи': 'agi', 'поміж': 'agi', 'поперед': 'agi',
+    'повз': 'ag',
+}.items()}
 
-def _process_preposition(msd: List[str], tag_set: Set[str], lemma: str) -> None:
+def _process_preposition(msd: bytearray, bits: int, lemma: str) -> None:
     """Process preposition-specific MSD positions."""
     # Type (Position 1)
-    msd[1] = 'p'  # preposition
+    msd[1] = _CODE_P  # preposition
     
     # Formation (Position 2)
     if '-' in lemma: 
-        msd[2] = 'c'  # compound
+        msd[2] = _CODE_C  # compound
     else: 
-        msd[2] = 's'  # simple
-
-    # Case (Position 3) - Define preposition case government
-    # This is a comprehensive mapping based on Ukrainian grammar
-    case_government = {
-        # Dative only
-        'завдяки': 'd', 'всупереч': 'd', 'усупереч': 'd', 'наперекір': 'd', 
-        'услід': 'd', 'назустріч': 'd', 'напротивагу': 'd',
-        
-        # Accusative only
-        'во': 'a', 'ві': 'a', 'про': 'a', 'через': 'a', 'крізь': 'a', 
-        'скрізь': 'a', 'об': 'a', 'поза': 'a', 'між': 'a', 
-        'незважаючи': 'a',
-        
-        # Instrumental only
-        'згідно з': 'i', 'надо': 'i', 'наді': 'i', 'передо': 'i', 
-        'переді': 'i',
-        
-        # Locative only
-        'при': 'l', 'вві': 'l', 'уві': 'l',
+        msd[2] = _CODE_S  # simple
+
+    # Case (Position 3)
+    # Multiple governed cases widen the buffer: 'agl' takes three positions
+    msd[3:4] = _CASE_GOVERNMENT.get(lemma, b'g')  # Default to genitive
+
+def _msd_template(pos: str, length: int) -> bytes:
+    """Return an empty MSD of the given length for a POS."""
+    return pos.encode('ascii') + b'-' * (length - 1)
+
+# Base POS tag -> (MSD template, handler for the remaining positions).
+# Templates are only as long as the positions the handler fills, so there
+# is little to strip afterwards; prepositions grow theirs for multiple
+# governed cases.
+_POS_TABLE = {
+    'noun': (_msd_template('N', 6), _process_noun),
+    'verb': (_msd_template('V', 8), _process_verb),
+    'adj': (_msd_template('A', 11), _process_adjective),
+    'adv': (_msd_template('R', 2), _process_adverb),
+    'advp': (_msd_template('V', 8), _process_verb),  # Gerund
+    'adjp': (_msd_template('A', 11), _process_adjective),  # Adjectival participle → Adjective
+    'prep': (_msd_template('S', 4), _process_preposition),
+    'conj': (_msd_template('C', 3), _process_conjunction),
+    'part': (_msd_template('Q', 1), None),
+    'intj': (_msd_template('I', 1), None),
+    'numr': (_msd_template('M', 7), _process_numeral),
+    'noninfl': (_msd_template('X', 1), None),
+    'onomat': (_msd_template('I', 1), None),
+    'insert': (_msd_template('X', 1), None),
+}
+_PRONOUN_ENTRY = (_msd_template('P', 9), _process_pronoun)
+_UNKNOWN_ENTRY = (_msd_template('X', 1), None)
+
+def _convert_line(numbered_line: Tuple[int, str]) -> Tuple[str, Optional[str], bool]:
+    """Convert one numbered input line.
+
+    Returns the output text, a diagnostic for stderr (or None) and whether
+    the line was converted. Runs in worker processes, so it only uses its
+    arguments and module state.
+    """
+    line_num, line = numbered_line
+    if line == '\n':
+        return '\n', None, False
+    
+    # split() skips surrounding whitespace itself, so the whole line only
+    # needs stripping when it is echoed back
+    parts = line.split(maxsplit=2)
+    if len(parts) < 3:
+        line = line.strip()
+        if not line:
+            return '\n', None, False
+        return line + '\n', f"Warning: Line {line_num} has insufficient parts: {line}", False
+    
+    lemma, word, tag_str = parts
+    tag_str = tag_str.rstrip()
+    tags = tag_str.split(':')  # never empty, and unknown POS tags map to X
+    
+    msd_tag = tags_to_msd(tags, lemma)
+    return f"{lemma}\t{word}\t{tag_str}\t{msd_tag}\n", None, True
+
+def convert_stream(lines: Iterable[str], jobs: int = 1) -> Iterator[Tuple[str, bool]]:
+    """Convert dict_uk lines, yielding (output line, converted) in input order.
+
+    Warnings are printed to stderr. With jobs > 1 the lines are converted
+    in a pool of worker processes.
+    """
+    chunk_size = 4096  # lines sent to a worker at a time
+    
+    with (mp.Pool(jobs) if jobs > 1 else nullcontext()) as pool:
+        numbered_lines = enumerate(lines, 1)
+        if pool:
+            # imap keeps input order for both output and diagnostics
+            results = pool.imap(_convert_line, numbered_lines, chunksize=chunk_size)
+        else:
+            results = map(_convert_line, numbered_lines)
         
-        # Multiple cases
-        'в': 'agl', 'у': 'agl', 'ув': 'agl', 'попри': 'agl',
-        'за': 'ai', 'над': 'ai', 'перед': 'ai', 'понад': 'ai', 
-        'попід': 'ai', 'під': 'ai',
-        'на': 'al', 'о': 'al', 'по': 'al',
-        'з': 'gi', 'із': 'gi',
-        'меж': 'agi', 'межи': 'agi', 'поміж': 'agi', 'поперед': 'agi',
-        'повз': 'ag',
-    }
-    
-    msd[3] = case_government.get(lemma, 'g')  # Default to genitive
+        for text, message, converted in results:
+            if message:
+                print(message, file=sys.stderr)
+            yield text, converted
 
 def main():
     """Main function to process files."""
@@ -445,38 +528,20 @@ def main():
     parser.add_argument("input_file", help='Input file path')
     parser.add_argument("output_file", help='Output file path')
     parser.add_argument("--encoding", default="utf-8", help='File encoding')
+    parser.add_argument("--jobs", type=int, default=1,
+                        help='Number of worker processes (1 converts in-process)')
     
     args = parser.parse_args()
     
+    buffer_size = 1 << 20
+    
     try:
-        with open(args.input_file, 'r', encoding=args.encoding) as infile, \
-             open(args.output_file, 'w', encoding=args.encoding) as outfile:
-            
+        with open(args.input_file, 'r', encoding=args.encoding, buffering=buffer_size) as infile, \
+             open(args.output_file, 'w', encoding=args.encoding, buffering=buffer_size) as outfile:
             line_count = 0
-            for line_num, line in enumerate(infile, 1):
-                line = line.strip()
-                if not line:
-                    outfile.write('\n')
-                    continue
-                
-                parts = line.split(maxsplit=2)
-                if len(parts) < 3:
-                    print(f"Warning: Line {line_num} has insufficient parts: {line}", 
-                          file=sys.stderr)
-                    outfile.write(line + '\n')
-                    continue
-                
-                lemma, word, tag_str = parts
-                tags = tag_str.split(':')
-                
-                try:
-                    msd_tag = tags_to_msd(tags, lemma)
-                    outfile.write(f"{lemma}\t{word}\t{tag_str}\t{msd_tag}\n")
-                    line_count += 1
-                except Exception as e:
-                    print(f"Error processing line {line_num}: {line}\nError: {e}", 
-                          file=sys.stderr)
-                    outfile.write(line + '\n')
+            for text, converted in convert_stream(infile, args.jobs):
+                outfile.write(text)
+                line_count += converted
                     
         print(f"Successfully processed {line_count} lines.", file=sys.stderr)
         